@@ -0,0 +1,296 @@
+package mcpgrafana
+
+import (
+	"bytes"
+	"io"
+	"net/http"
+	"strings"
+	"sync"
+	"time"
+)
+
+const (
+	cacheTTLEnvVar = "GRAFANA_CACHE_TTL"
+
+	defaultCacheTTL = time.Minute
+
+	// maxCacheEntries bounds the number of responses kept in the cache.
+	maxCacheEntries = 256
+	// maxCacheSize bounds the total size of the response bodies kept in the
+	// cache. The cache is on by default, so this is kept small.
+	maxCacheSize = 32 << 20
+	// maxCacheEntrySize is the largest response body that will be cached,
+	// which keeps a single large response from taking most of the budget.
+	maxCacheEntrySize = maxCacheSize / 16
+	// maxCacheKeyBodySize is the largest form body that will be used as part
+	// of a cache key. Larger POST requests are not cached.
+	maxCacheKeyBodySize = 64 << 10
+)
+
+// isCacheablePath reports whether responses for the given URL path may be
+// cached. Only read-only metadata endpoints, whose responses change rarely
+// and are requested repeatedly during an investigation, are cached.
+func isCacheablePath(p string) bool {
+	switch {
+	// Prometheus and Loki label names and values.
+	case strings.HasSuffix(p, "/api/v1/labels"),
+		strings.Contains(p, "/api/v1/label/") && strings.HasSuffix(p, "/values"):
+		return true
+	// Prometheus metric metadata.
+	case strings.HasSuffix(p, "/api/v1/metadata"):
+		return true
+	// The settings used to look up the OnCall API URL.
+	case strings.HasSuffix(p, "/api/plugins/grafana-irm-app/settings"):
+		return true
+	}
+	return false
+}
+
+type cachedResponse struct {
+	status  string
+	code    int
+	proto   string
+	header  http.Header
+	body    []byte
+	expires time.Time
+}
+
+func (c *cachedResponse) toResponse(req *http.Request) *http.Response {
+	return &http.Response{
+		Status:        c.status,
+		StatusCode:    c.code,
+		Proto:         c.proto,
+		Header:        c.header.Clone(),
+		Body:          io.NopCloser(bytes.NewReader(c.body)),
+		ContentLength: int64(len(c.body)),
+		Request:       req,
+	}
+}
+
+// isCacheablePost reports whether a form-encoded POST to the given URL path
+// may be cached. The Prometheus client sends label name requests as POSTs
+// (falling back to GET only if the server rejects them), so they would
+// otherwise never be cached.
+func isCacheablePost(req *http.Request) bool {
+	return strings.HasSuffix(req.URL.Path, "/api/v1/labels") &&
+		req.Header.Get("Content-Type") == "application/x-www-form-urlencoded"
+}
+
+// cachingRoundTripper is an http.RoundTripper that caches successful GET
+// responses for the endpoints accepted by isCacheablePath for a fixed TTL,
+// as well as form-encoded POST requests accepted by isCacheablePost.
+//
+// Identical requests made while a request is already in flight wait for its
+// response rather than each going to the network.
+//
+// Cache keys include the Authorization header, so responses are never shared
+// between different credentials.
+type cachingRoundTripper struct {
+	underlying http.RoundTripper
+	ttl        time.Duration
+	now        func() time.Time
+
+	// maxSize is the budget for the total size of cached response bodies.
+	maxSize int
+
+	mu       sync.Mutex
+	entries  map[string]*cachedResponse
+	size     int
+	inflight map[string]*inflightRequest
+}
+
+// inflightRequest tracks a cacheable request that has been sent but has not
+// yet completed. done is closed once the request completes; cached is set
+// beforehand if the response was cached.
+type inflightRequest struct {
+	done   chan struct{}
+	cached *cachedResponse
+}
+
+func newCachingRoundTripper(underlying http.RoundTripper, ttl time.Duration) *cachingRoundTripper {
+	return &cachingRoundTripper{
+		underlying: underlying,
+		ttl:        ttl,
+		now:        time.Now,
+		maxSize:    maxCacheSize,
+		entries:    make(map[string]*cachedResponse),
+		inflight:   make(map[string]*inflightRequest),
+	}
+}
+
+// cacheKey returns the key used to cache the response to req, or false if
+// the response must not be cached.
+//
+// POST requests are keyed by their form body as well as their URL. The body
+// is read from a copy obtained with GetBody, so req itself is left untouched.
+func cacheKey(req *http.Request) (string, bool) {
+	switch req.Method {
+	case http.MethodGet:
+		if !isCacheablePath(req.URL.Path) {
+			return "", false
+		}
+		return req.URL.String() + "\x00" + req.Header.Get("Authorization"), true
+	case http.MethodPost:
+		if !isCacheablePost(req) || req.GetBody == nil {
+			return "", false
+		}
+		body, err := req.GetBody()
+		if err != nil {
+			return "", false
+		}
+		defer body.Close()
+		form, err := io.ReadAll(io.LimitReader(body, maxCacheKeyBodySize+1))
+		if err != nil || len(form) > maxCacheKeyBodySize {
+			return "", false
+		}
+		return "POST " + req.URL.String() + "\x00" + string(form) + "\x00" + req.Header.Get("Authorization"), true
+	}
+	return "", false
+}
+
+func (rt *cachingRoundTripper) RoundTrip(req *http.Request) (*http.Response, error) {
+	key, ok := cacheKey(req)
+	if !ok {
+		return rt.underlying.RoundTrip(req)
+	}
+
+	cached, call, leader := rt.lookup(key)
+	if cached != nil {
+		closeRequestBody(req)
+		return cached.toResponse(req), nil
+	}
+
+	if !leader {
+		select {
+		case <-call.done:
+		case <-req.Context().Done():
+			closeRequestBody(req)
+			return nil, req.Context().Err()
+		}
+		if call.cached != nil {
+			closeRequestBody(req)
+			return call.cached.toResponse(req), nil
+		}
+		// The shared request failed or its response couldn't be cached, so
+		// make our own request rather than sharing another caller's error.
+		return rt.underlying.RoundTrip(req)
+	}
+
+	defer rt.finish(key, call)
+
+	resp, err := rt.underlying.RoundTrip(req)
+	if err != nil || resp.StatusCode != http.StatusOK || resp.ContentLength > maxCacheEntrySize {
+		return resp, err
+	}
+
+	body, err := io.ReadAll(io.LimitReader(resp.Body, maxCacheEntrySize+1))
+	if err != nil {
+		resp.Body.Close()
+		return nil, err
+	}
+	if len(body) > maxCacheEntrySize {
+		// Too large to cache: hand back what we've read followed by the rest of the body.
+		resp.Body = struct {
+			io.Reader
+			io.Closer
+		}{io.MultiReader(bytes.NewReader(body), resp.Body), resp.Body}
+		return resp, nil
+	}
+	resp.Body.Close()
+
+	cached = &cachedResponse{
+		status:  resp.Status,
+		code:    resp.StatusCode,
+		proto:   resp.Proto,
+		header:  resp.Header.Clone(),
+		body:    body,
+		expires: rt.now().Add(rt.ttl),
+	}
+	rt.set(key, cached)
+	call.cached = cached
+	return cached.toResponse(req), nil
+}
+
+// closeRequestBody closes the body of a request that won't be sent, since a
+// RoundTripper must always close the request body.
+func closeRequestBody(req *http.Request) {
+	if req.Body != nil {
+		req.Body.Close()
+	}
+}
+
+// lookup returns the cached response for key if there is an unexpired one.
+// Otherwise it returns the in-flight request for key, registering a new one
+// if there is none, in which case leader is true and the caller is
+// responsible for making the request and calling finish.
+func (rt *cachingRoundTripper) lookup(key string) (cached *cachedResponse, call *inflightRequest, leader bool) {
+	rt.mu.Lock()
+	defer rt.mu.Unlock()
+	if cached, ok := rt.entries[key]; ok {
+		if rt.now().Before(cached.expires) {
+			return cached, nil, false
+		}
+		rt.remove(key)
+	}
+	if call, ok := rt.inflight[key]; ok {
+		return nil, call, false
+	}
+	call = &inflightRequest{done: make(chan struct{})}
+	rt.inflight[key] = call
+	return nil, call, true
+}
+
+func (rt *cachingRoundTripper) finish(key string, call *inflightRequest) {
+	rt.mu.Lock()
+	delete(rt.inflight, key)
+	rt.mu.Unlock()
+	close(call.done)
+}
+
+// set adds cached to the cache. If that would exceed the entry limit or the
+// size budget, expired entries are evicted first, followed by the oldest.
+func (rt *cachingRoundTripper) set(key string, cached *cachedResponse) {
+	if len(cached.body) > rt.maxSize {
+		return
+	}
+	rt.mu.Lock()
+	defer rt.mu.Unlock()
+	if _, ok := rt.entries[key]; ok {
+		rt.remove(key)
+	}
+	full := func() bool {
+		return len(rt.entries) >= maxCacheEntries || rt.size+len(cached.body) > rt.maxSize
+	}
+	if full() {
+		now := rt.now()
+		for k, v := range rt.entries {
+			if !now.Before(v.expires) {
+				rt.remove(k)
+			}
+		}
+	}
+	for full() {
+		rt.removeOldest()
+	}
+	rt.entries[key] = cached
+	rt.size += len(cached.body)
+}
+
+// remove deletes the entry for key. rt.mu must be held.
+func (rt *cachingRoundTripper) remove(key string) {
+	rt.size -= len(rt.entries[key].body)
+	delete(rt.entries, key)
+}
+
+// removeOldest deletes the entry that expires first, which is the oldest
+// since every entry has the same TTL. rt.mu must be held.
+func (rt *cachingRoundTripper) removeOldest() {
+	var oldest string
+	var oldestExpires time.Time
+	for k, v := range rt.entries {
+		if oldest == "" || v.expires.Before(oldestExpires) {
+			oldest, oldestExpires = k, v.expires
+		}
+	}
+	rt.remove(oldest)
+}
@@ -0,0 +1,300 @@
+//go:build unit
+// +build unit
+
+package mcpgrafana
+
+import (
+	"context"
+	"io"
+	"net/http"
+	"net/http/httptest"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/prometheus/client_golang/api"
+	promv1 "github.com/prometheus/client_golang/api/prometheus/v1"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+func TestIsCacheablePath(t *testing.T) {
+	for _, p := range []string{
+		"/api/datasources/proxy/uid/prometheus/api/v1/labels",
+		"/api/datasources/proxy/uid/prometheus/api/v1/label/job/values",
+		"/api/datasources/proxy/uid/prometheus/api/v1/metadata",
+		"/api/datasources/proxy/uid/loki/loki/api/v1/labels",
+		"/api/datasources/proxy/uid/loki/loki/api/v1/label/app/values",
+		"/api/plugins/grafana-irm-app/settings",
+	} {
+		assert.True(t, isCacheablePath(p), p)
+	}
+	for _, p := range []string{
+		"/api/datasources/proxy/uid/prometheus/api/v1/query_range",
+		"/api/datasources/proxy/uid/loki/loki/api/v1/query_range",
+		"/api/datasources/proxy/uid/loki/loki/api/v1/index/stats",
+		"/api/dashboards/uid/abc",
+	} {
+		assert.False(t, isCacheablePath(p), p)
+	}
+}
+
+func TestCachingRoundTripper(t *testing.T) {
+	var hits atomic.Int32
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		hits.Add(1)
+		w.Header().Set("Content-Type", "application/json")
+		_, _ = w.Write([]byte(`{"status":"success","data":["a","b"]}`))
+	}))
+	defer ts.Close()
+
+	now := time.Now()
+	rt := newCachingRoundTripper(http.DefaultTransport, time.Minute)
+	rt.now = func() time.Time { return now }
+	client := &http.Client{Transport: rt}
+
+	get := func(t *testing.T, path, auth string) string {
+		req, err := http.NewRequest(http.MethodGet, ts.URL+path, nil)
+		require.NoError(t, err)
+		if auth != "" {
+			req.Header.Set("Authorization", auth)
+		}
+		resp, err := client.Do(req)
+		require.NoError(t, err)
+		defer resp.Body.Close()
+		require.Equal(t, http.StatusOK, resp.StatusCode)
+		assert.Equal(t, "application/json", resp.Header.Get("Content-Type"))
+		body, err := io.ReadAll(resp.Body)
+		require.NoError(t, err)
+		return string(body)
+	}
+
+	t.Run("repeated requests are served from the cache", func(t *testing.T) {
+		hits.Store(0)
+		first := get(t, "/api/v1/labels", "Bearer a")
+		second := get(t, "/api/v1/labels", "Bearer a")
+		assert.Equal(t, first, second)
+		assert.Equal(t, int32(1), hits.Load())
+	})
+
+	t.Run("different credentials are not shared", func(t *testing.T) {
+		hits.Store(0)
+		get(t, "/api/v1/label/job/values", "Bearer a")
+		get(t, "/api/v1/label/job/values", "Bearer b")
+		assert.Equal(t, int32(2), hits.Load())
+	})
+
+	t.Run("different query parameters are not shared", func(t *testing.T) {
+		hits.Store(0)
+		get(t, "/api/v1/metadata?limit=1", "")
+		get(t, "/api/v1/metadata?limit=2", "")
+		assert.Equal(t, int32(2), hits.Load())
+	})
+
+	t.Run("entries expire", func(t *testing.T) {
+		hits.Store(0)
+		get(t, "/api/v1/labels?expire", "")
+		now = now.Add(2 * time.Minute)
+		get(t, "/api/v1/labels?expire", "")
+		assert.Equal(t, int32(2), hits.Load())
+	})
+
+	t.Run("other endpoints are not cached", func(t *testing.T) {
+		hits.Store(0)
+		get(t, "/api/v1/query_range", "")
+		get(t, "/api/v1/query_range", "")
+		assert.Equal(t, int32(2), hits.Load())
+	})
+}
+
+func TestCachingRoundTripperSizeBudget(t *testing.T) {
+	var hits atomic.Int32
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		hits.Add(1)
+		_, _ = w.Write([]byte("abcd"))
+	}))
+	defer ts.Close()
+
+	now := time.Now()
+	rt := newCachingRoundTripper(http.DefaultTransport, time.Minute)
+	rt.now = func() time.Time {
+		now = now.Add(time.Millisecond)
+		return now
+	}
+	rt.maxSize = 10
+	client := &http.Client{Transport: rt}
+
+	get := func(t *testing.T, path string) {
+		resp, err := client.Get(ts.URL + path)
+		require.NoError(t, err)
+		defer resp.Body.Close()
+		body, err := io.ReadAll(resp.Body)
+		require.NoError(t, err)
+		assert.Equal(t, "abcd", string(body))
+	}
+
+	get(t, "/api/v1/labels?n=1")
+	get(t, "/api/v1/labels?n=2")
+	get(t, "/api/v1/labels?n=3")
+	assert.Equal(t, int32(3), hits.Load())
+	assert.Len(t, rt.entries, 2)
+	assert.Equal(t, 8, rt.size)
+
+	// The newest entries are still cached; the oldest was evicted to make room.
+	get(t, "/api/v1/labels?n=3")
+	get(t, "/api/v1/labels?n=2")
+	assert.Equal(t, int32(3), hits.Load())
+	get(t, "/api/v1/labels?n=1")
+	assert.Equal(t, int32(4), hits.Load())
+	assert.LessOrEqual(t, rt.size, rt.maxSize)
+}
+
+func TestCachingRoundTripperPrometheusLabelNames(t *testing.T) {
+	var hits atomic.Int32
+	var methods sync.Map
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		hits.Add(1)
+		methods.Store(r.Method, true)
+		w.Header().Set("Content-Type", "application/json")
+		_, _ = w.Write([]byte(`{"status":"success","data":["__name__","job"]}`))
+	}))
+	defer ts.Close()
+
+	c, err := api.NewClient(api.Config{
+		Address:      ts.URL + "/api/datasources/proxy/uid/prometheus",
+		RoundTripper: newCachingRoundTripper(http.DefaultTransport, time.Minute),
+	})
+	require.NoError(t, err)
+	promClient := promv1.NewAPI(c)
+
+	ctx := context.Background()
+	start, end := time.Unix(0, 0), time.Unix(3600, 0)
+	labelNames := func(t *testing.T, matches ...string) []string {
+		names, _, err := promClient.LabelNames(ctx, matches, start, end)
+		require.NoError(t, err)
+		return names
+	}
+
+	t.Run("repeated requests are served from the cache", func(t *testing.T) {
+		hits.Store(0)
+		first := labelNames(t, `up`)
+		second := labelNames(t, `up`)
+		assert.Equal(t, []string{"__name__", "job"}, first)
+		assert.Equal(t, first, second)
+		assert.Equal(t, int32(1), hits.Load())
+		_, posted := methods.Load(http.MethodPost)
+		assert.True(t, posted, "expected the Prometheus client to POST label name requests")
+	})
+
+	t.Run("different form bodies are not shared", func(t *testing.T) {
+		hits.Store(0)
+		labelNames(t, `up{job="a"}`)
+		labelNames(t, `up{job="b"}`)
+		assert.Equal(t, int32(2), hits.Load())
+	})
+}
+
+// trackingBody records whether it has been closed.
+type trackingBody struct {
+	io.Reader
+	closed atomic.Bool
+}
+
+func (b *trackingBody) Close() error {
+	b.closed.Store(true)
+	return nil
+}
+
+func TestCachingRoundTripperClosesRequestBody(t *testing.T) {
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		_, _ = w.Write([]byte(`{"status":"success","data":["a"]}`))
+	}))
+	defer ts.Close()
+
+	rt := newCachingRoundTripper(http.DefaultTransport, time.Minute)
+	post := func(t *testing.T) *trackingBody {
+		const form = "match%5B%5D=up"
+		body := &trackingBody{Reader: strings.NewReader(form)}
+		req, err := http.NewRequest(http.MethodPost, ts.URL+"/api/v1/labels", body)
+		require.NoError(t, err)
+		req.Header.Set("Content-Type", "application/x-www-form-urlencoded")
+		req.GetBody = func() (io.ReadCloser, error) {
+			return io.NopCloser(strings.NewReader(form)), nil
+		}
+		resp, err := rt.RoundTrip(req)
+		require.NoError(t, err)
+		resp.Body.Close()
+		return body
+	}
+
+	// The first request is sent, the second is served from the cache; both
+	// request bodies must be closed.
+	assert.True(t, post(t).closed.Load())
+	assert.True(t, post(t).closed.Load())
+}
+
+func TestCachingRoundTripperSkipsErrors(t *testing.T) {
+	var hits atomic.Int32
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		hits.Add(1)
+		w.WriteHeader(http.StatusInternalServerError)
+	}))
+	defer ts.Close()
+
+	client := &http.Client{Transport: newCachingRoundTripper(http.DefaultTransport, time.Minute)}
+	for i := 0; i < 2; i++ {
+		resp, err := client.Get(ts.URL + "/api/v1/labels")
+		require.NoError(t, err)
+		resp.Body.Close()
+		assert.Equal(t, http.StatusInternalServerError, resp.StatusCode)
+	}
+	assert.Equal(t, int32(2), hits.Load())
+}
+
+func TestCachingRoundTripperCoalescesConcurrentRequests(t *testing.T) {
+	var hits atomic.Int32
+	release := make(chan struct{})
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		hits.Add(1)
+		<-release
+		_, _ = w.Write([]byte(`{"status":"success","data":["a"]}`))
+	}))
+	defer ts.Close()
+
+	rt := newCachingRoundTripper(http.DefaultTransport, time.Minute)
+	client := &http.Client{Transport: rt}
+
+	const n = 10
+	var wg sync.WaitGroup
+	bodies := make([]string, n)
+	for i := 0; i < n; i++ {
+		wg.Add(1)
+		go func(i int) {
+			defer wg.Done()
+			resp, err := client.Get(ts.URL + "/api/v1/labels")
+			if !assert.NoError(t, err) {
+				return
+			}
+			defer resp.Body.Close()
+			body, _ := io.ReadAll(resp.Body)
+			bodies[i] = string(body)
+		}(i)
+	}
+
+	// Wait until the first request has reached the server before letting it
+	// complete. Requests that arrive after that are served from the cache.
+	require.Eventually(t, func() bool {
+		rt.mu.Lock()
+		defer rt.mu.Unlock()
+		return hits.Load() == 1 && len(rt.inflight) == 1
+	}, time.Second, time.Millisecond)
+	close(release)
+	wg.Wait()
+
+	assert.Equal(t, int32(1), hits.Load())
+	for _, body := range bodies {
+		assert.Equal(t, `{"status":"success","data":["a"]}`, body)
+	}
+}
@@ -2,10 +2,14 @@ package main
 
 import (
 	"context"
+	"errors"
 	"flag"
 	"fmt"
 	"log/slog"
+	"net/http"
 	"os"
+	"os/signal"
+	"syscall"
 
 	"github.com/mark3labs/mcp-go/server"
 
@@ -13,46 +17,97 @@ import (
 	"github.com/grafana/mcp-grafana/tools"
 )
 
-func newServer() *server.MCPServer {
+// disabledTools holds the tool categories that have been disabled on the
+// command line.
+type disabledTools struct {
+	search, datasource, incident, prometheus, loki, alerting, dashboard, oncall bool
+}
+
+func (dt *disabledTools) addFlags() {
+	flag.BoolVar(&dt.search, "disable-search", false, "Disable search tools")
+	flag.BoolVar(&dt.datasource, "disable-datasource", false, "Disable datasource tools")
+	flag.BoolVar(&dt.incident, "disable-incident", false, "Disable incident tools")
+	flag.BoolVar(&dt.prometheus, "disable-prometheus", false, "Disable prometheus tools")
+	flag.BoolVar(&dt.loki, "disable-loki", false, "Disable loki tools")
+	flag.BoolVar(&dt.alerting, "disable-alerting", false, "Disable alerting tools")
+	flag.BoolVar(&dt.dashboard, "disable-dashboard", false, "Disable dashboard tools")
+	flag.BoolVar(&dt.oncall, "disable-oncall", false, "Disable oncall tools")
+}
+
+// addTools registers the tools in every category that hasn't been disabled.
+func (dt *disabledTools) addTools(s *server.MCPServer) {
+	for _, c := range []struct {
+		disabled bool
+		add      func(*server.MCPServer)
+	}{
+		{dt.search, tools.AddSearchTools},
+		{dt.datasource, tools.AddDatasourceTools},
+		{dt.incident, tools.AddIncidentTools},
+		{dt.prometheus, tools.AddPrometheusTools},
+		{dt.loki, tools.AddLokiTools},
+		{dt.alerting, tools.AddAlertingTools},
+		{dt.dashboard, tools.AddDashboardTools},
+		{dt.oncall, tools.AddOnCallTools},
+	} {
+		if !c.disabled {
+			c.add(s)
+		}
+	}
+}
+
+func newServer(dt disabledTools) *server.MCPServer {
 	s := server.NewMCPServer(
 		"mcp-grafana",
 		"0.1.0",
 		// server.WithLogging(),
 	)
-	tools.AddSearchTools(s)
-	tools.AddDatasourceTools(s)
-	tools.AddIncidentTools(s)
-	tools.AddPrometheusTools(s)
-	tools.AddLokiTools(s)
-	tools.AddAlertingTools(s)
-	tools.AddDashboardTools(s)
-	tools.AddOnCallTools(s)
+	dt.addTools(s)
 	return s
 }
 
-func run(transport, addr string, logLevel slog.Level) error {
+func run(transport, addr string, logLevel slog.Level, dt disabledTools) error {
+	// Check the transport before doing any setup, so that a typo fails fast.
+	if transport != "stdio" && transport != "sse" {
+		return fmt.Errorf(
+			"Invalid transport type: %s. Must be 'stdio' or 'sse'",
+			transport,
+		)
+	}
+
 	slog.SetDefault(slog.New(slog.NewTextHandler(os.Stderr, &slog.HandlerOptions{Level: logLevel})))
-	s := newServer()
+	s := newServer(dt)
+	defer mcpgrafana.CloseIdleConnections()
+
+	ctx, stop := signal.NotifyContext(context.Background(), os.Interrupt, syscall.SIGTERM)
+	defer stop()
+
+	// Establish a connection to Grafana while waiting for the first request.
+	go mcpgrafana.WarmUpConnections(ctx)
 
 	switch transport {
 	case "stdio":
 		srv := server.NewStdioServer(s)
 		srv.SetContextFunc(mcpgrafana.ComposedStdioContextFunc)
 		slog.Info("Starting Grafana MCP server using stdio transport")
-		return srv.Listen(context.Background(), os.Stdin, os.Stdout)
+		// Listen returns the context's error once a signal cancels it, which
+		// is a normal shutdown rather than a failure.
+		if err := srv.Listen(ctx, os.Stdin, os.Stdout); err != nil && !errors.Is(err, context.Canceled) {
+			return fmt.Errorf("Server error: %v", err)
+		}
 	case "sse":
 		srv := server.NewSSEServer(s,
 			server.WithSSEContextFunc(mcpgrafana.ComposedSSEContextFunc),
 		)
+		go func() {
+			<-ctx.Done()
+			if err := srv.Shutdown(context.Background()); err != nil {
+				slog.Error("Error shutting down SSE server", "error", err)
+			}
+		}()
 		slog.Info("Starting Grafana MCP server using SSE transport", "address", addr)
-		if err := srv.Start(addr); err != nil {
+		if err := srv.Start(addr); err != nil && !errors.Is(err, http.ErrServerClosed) {
 			return fmt.Errorf("Server error: %v", err)
 		}
-	default:
-		return fmt.Errorf(
-			"Invalid transport type: %s. Must be 'stdio' or 'sse'",
-			transport,
-		)
 	}
 	return nil
 }
@@ -68,9 +123,11 @@ func main() {
 	)
 	addr := flag.String("sse-address", "localhost:8000", "The host and port to start the sse server on")
 	logLevel := flag.String("log-level", "info", "Log level (debug, info, warn, error)")
+	var dt disabledTools
+	dt.addFlags()
 	flag.Parse()
 
-	if err := run(transport, *addr, parseLevel(*logLevel)); err != nil {
+	if err := run(transport, *addr, parseLevel(*logLevel), dt); err != nil {
 		panic(err)
 	}
 }
@@ -0,0 +1,61 @@
+package mcpgrafana
+
+import (
+	"io"
+	"net/http"
+	"sync"
+)
+
+const maxConcurrentRequestsEnvVar = "GRAFANA_MAX_CONCURRENT_REQUESTS"
+
+// limitingRoundTripper is an http.RoundTripper that bounds the number of
+// requests in flight at once.
+//
+// A request holds its slot until its response body is closed, so callers
+// that stream a response count against the limit for as long as they read
+// it. Requests waiting for a slot give up when their context is cancelled.
+type limitingRoundTripper struct {
+	underlying http.RoundTripper
+	sem        chan struct{}
+}
+
+func newLimitingRoundTripper(underlying http.RoundTripper, limit int) *limitingRoundTripper {
+	return &limitingRoundTripper{
+		underlying: underlying,
+		sem:        make(chan struct{}, limit),
+	}
+}
+
+func (rt *limitingRoundTripper) RoundTrip(req *http.Request) (*http.Response, error) {
+	select {
+	case rt.sem <- struct{}{}:
+	case <-req.Context().Done():
+		closeRequestBody(req)
+		return nil, req.Context().Err()
+	}
+
+	resp, err := rt.underlying.RoundTrip(req)
+	if err != nil {
+		rt.release()
+		return nil, err
+	}
+	resp.Body = &releasingBody{ReadCloser: resp.Body, release: rt.release}
+	return resp, nil
+}
+
+func (rt *limitingRoundTripper) release() {
+	<-rt.sem
+}
+
+// releasingBody calls release the first time the body is closed.
+type releasingBody struct {
+	io.ReadCloser
+	once    sync.Once
+	release func()
+}
+
+func (b *releasingBody) Close() error {
+	err := b.ReadCloser.Close()
+	b.once.Do(b.release)
+	return err
+}
@@ -0,0 +1,71 @@
+//go:build unit
+// +build unit
+
+package mcpgrafana
+
+import (
+	"context"
+	"net/http"
+	"net/http/httptest"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+func TestLimitingRoundTripper(t *testing.T) {
+	var inflight, maxInflight atomic.Int32
+	release := make(chan struct{})
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		n := inflight.Add(1)
+		defer inflight.Add(-1)
+		for {
+			m := maxInflight.Load()
+			if n <= m || maxInflight.CompareAndSwap(m, n) {
+				break
+			}
+		}
+		<-release
+	}))
+	defer ts.Close()
+
+	rt := newLimitingRoundTripper(http.DefaultTransport, 2)
+	client := &http.Client{Transport: rt}
+
+	var wg sync.WaitGroup
+	for i := 0; i < 5; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			resp, err := client.Get(ts.URL)
+			if assert.NoError(t, err) {
+				resp.Body.Close()
+			}
+		}()
+	}
+
+	require.Eventually(t, func() bool { return inflight.Load() == 2 }, time.Second, time.Millisecond)
+	close(release)
+	wg.Wait()
+
+	assert.Equal(t, int32(2), maxInflight.Load())
+	assert.Empty(t, rt.sem, "all slots should be released once bodies are closed")
+}
+
+func TestLimitingRoundTripperHonoursContext(t *testing.T) {
+	rt := newLimitingRoundTripper(http.DefaultTransport, 1)
+	rt.sem <- struct{}{}
+
+	ctx, cancel := context.WithCancel(context.Background())
+	cancel()
+	body := &trackingBody{Reader: strings.NewReader("match%5B%5D=up")}
+	req, err := http.NewRequestWithContext(ctx, http.MethodPost, "http://localhost", body)
+	require.NoError(t, err)
+	_, err = rt.RoundTrip(req)
+	assert.ErrorIs(t, err, context.Canceled)
+	assert.True(t, body.closed.Load(), "the request body should be closed")
+}
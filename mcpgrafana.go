@@ -8,6 +8,7 @@ import (
 	"net/url"
 	"os"
 	"strings"
+	"sync"
 
 	"github.com/go-openapi/strfmt"
 	"github.com/grafana/grafana-openapi-client-go/client"
@@ -24,6 +25,9 @@ const (
 
 	grafanaURLHeader    = "X-Grafana-URL"
 	grafanaAPIKeyHeader = "X-Grafana-API-Key"
+
+	// incidentAPIPath is the path of the Grafana Incident API, relative to the Grafana URL.
+	incidentAPIPath = "/api/plugins/grafana-incident-app/resources/api/v1/"
 )
 
 func urlAndAPIKeyFromEnv() (string, string) {
@@ -60,16 +64,20 @@ var ExtractGrafanaInfoFromEnv server.StdioContextFunc = func(ctx context.Context
 // from request headers and injects a configured client into the context.
 var ExtractGrafanaInfoFromHeaders server.SSEContextFunc = func(ctx context.Context, req *http.Request) context.Context {
 	u, apiKey := urlAndAPIKeyFromHeaders(req)
-	uEnv, apiKeyEnv := urlAndAPIKeyFromEnv()
-	if u == "" {
-		u = uEnv
+	// Only fall back to the environment when the headers don't provide
+	// everything, rather than reading it on every request.
+	if u == "" || apiKey == "" {
+		uEnv, apiKeyEnv := urlAndAPIKeyFromEnv()
+		if u == "" {
+			u = uEnv
+		}
+		if apiKey == "" {
+			apiKey = apiKeyEnv
+		}
 	}
 	if u == "" {
 		u = defaultGrafanaURL
 	}
-	if apiKey == "" {
-		apiKey = apiKeyEnv
-	}
 	return WithGrafanaURL(WithGrafanaAPIKey(ctx, apiKey), u)
 }
 
@@ -101,6 +109,52 @@ func GrafanaAPIKeyFromContext(ctx context.Context) string {
 
 type grafanaClientKey struct{}
 
+// maxCachedClients bounds the number of clients kept by a ClientCache.
+// The URL and API key come from request headers, so the cache must not be
+// allowed to grow without limit.
+const maxCachedClients = 64
+
+type clientCacheKey struct {
+	url    string
+	apiKey string
+}
+
+// ClientCache holds clients keyed by the URL and API key they were created
+// with. When full, the cache is cleared rather than evicting individual
+// entries, which is sufficient for the small number of distinct credentials
+// used in practice.
+//
+// The zero value is an empty cache ready for use.
+type ClientCache[T any] struct {
+	mu      sync.Mutex
+	clients map[clientCacheKey]T
+}
+
+// GetOrCreate returns the client cached for url and apiKey. If there is none,
+// it calls create and caches the result, unless create returns an error.
+func (c *ClientCache[T]) GetOrCreate(url, apiKey string, create func() (T, error)) (T, error) {
+	key := clientCacheKey{url: url, apiKey: apiKey}
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if v, ok := c.clients[key]; ok {
+		return v, nil
+	}
+	v, err := create()
+	if err != nil {
+		return v, err
+	}
+	if c.clients == nil || len(c.clients) >= maxCachedClients {
+		c.clients = make(map[clientCacheKey]T)
+	}
+	c.clients[key] = v
+	return v, nil
+}
+
+var (
+	grafanaClients  ClientCache[*client.GrafanaHTTPAPI]
+	incidentClients ClientCache[*incident.Client]
+)
+
 // ExtractGrafanaClientFromEnv is a StdioContextFunc that extracts Grafana configuration
 // from environment variables and injects a configured client into the context.
 var ExtractGrafanaClientFromEnv server.StdioContextFunc = func(ctx context.Context) context.Context {
@@ -137,23 +191,28 @@ var ExtractGrafanaClientFromEnv server.StdioContextFunc = func(ctx context.Conte
 
 // ExtractGrafanaClientFromHeaders is a SSEContextFunc that extracts Grafana configuration
 // from request headers and injects a configured client into the context.
+//
+// Clients are cached by URL and API key, so requests using the same
+// credentials share a client rather than creating a new one per request.
 var ExtractGrafanaClientFromHeaders server.SSEContextFunc = func(ctx context.Context, req *http.Request) context.Context {
-	cfg := client.DefaultTransportConfig()
-	// Extract transport config from request headers, and set it on the context.
 	u, apiKey := urlAndAPIKeyFromHeaders(req)
-	if u != "" {
-		if url, err := url.Parse(u); err == nil {
-			cfg.Host = url.Host
-			if url.Scheme == "http" {
-				cfg.Schemes = []string{"http"}
+	c, _ := grafanaClients.GetOrCreate(u, apiKey, func() (*client.GrafanaHTTPAPI, error) {
+		cfg := client.DefaultTransportConfig()
+		// Extract transport config from request headers, and set it on the context.
+		if u != "" {
+			if url, err := url.Parse(u); err == nil {
+				cfg.Host = url.Host
+				if url.Scheme == "http" {
+					cfg.Schemes = []string{"http"}
+				}
 			}
 		}
-	}
-	if apiKey != "" {
-		cfg.APIKey = apiKey
-	}
-	client := client.NewHTTPClientWithConfig(strfmt.Default, cfg)
-	return WithGrafanaClient(ctx, client)
+		if apiKey != "" {
+			cfg.APIKey = apiKey
+		}
+		return client.NewHTTPClientWithConfig(strfmt.Default, cfg), nil
+	})
+	return WithGrafanaClient(ctx, c)
 }
 
 // WithGrafanaClient sets the Grafana client in the context.
@@ -179,7 +238,7 @@ var ExtractIncidentClientFromEnv server.StdioContextFunc = func(ctx context.Cont
 	if grafanaURL == "" {
 		grafanaURL = defaultGrafanaURL
 	}
-	incidentURL := fmt.Sprintf("%s/api/plugins/grafana-incident-app/resources/api/v1/", grafanaURL)
+	incidentURL := grafanaURL + incidentAPIPath
 	parsedURL, err := url.Parse(incidentURL)
 	if err != nil {
 		panic(fmt.Errorf("invalid incident URL %s: %w", incidentURL, err))
@@ -191,8 +250,10 @@ var ExtractIncidentClientFromEnv server.StdioContextFunc = func(ctx context.Cont
 
 var ExtractIncidentClientFromHeaders server.SSEContextFunc = func(ctx context.Context, req *http.Request) context.Context {
 	grafanaURL, apiKey := urlAndAPIKeyFromHeaders(req)
-	incidentURL := fmt.Sprintf("%s/api/plugins/grafana-incident-app/resources/api/v1/", grafanaURL)
-	client := incident.NewClient(incidentURL, apiKey)
+	client, _ := incidentClients.GetOrCreate(grafanaURL, apiKey, func() (*incident.Client, error) {
+		incidentURL := grafanaURL + incidentAPIPath
+		return incident.NewClient(incidentURL, apiKey), nil
+	})
 	return context.WithValue(ctx, incidentClientKey{}, client)
 }
 
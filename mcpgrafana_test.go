@@ -5,6 +5,8 @@ package mcpgrafana
 
 import (
 	"context"
+	"errors"
+	"fmt"
 	"net/http"
 	"testing"
 
@@ -73,3 +75,49 @@ func TestExtractGrafanaInfoFromHeaders(t *testing.T) {
 		assert.Equal(t, "my-test-api-key", apiKey)
 	})
 }
+
+func TestExtractClientsFromHeadersAreCached(t *testing.T) {
+	newRequest := func(apiKey string) *http.Request {
+		req, err := http.NewRequest("GET", "http://example.com", nil)
+		require.NoError(t, err)
+		req.Header.Set(grafanaURLHeader, "http://my-test-url.grafana.com")
+		req.Header.Set(grafanaAPIKeyHeader, apiKey)
+		return req
+	}
+
+	t.Run("grafana client", func(t *testing.T) {
+		first := GrafanaClientFromContext(ExtractGrafanaClientFromHeaders(context.Background(), newRequest("key-1")))
+		second := GrafanaClientFromContext(ExtractGrafanaClientFromHeaders(context.Background(), newRequest("key-1")))
+		other := GrafanaClientFromContext(ExtractGrafanaClientFromHeaders(context.Background(), newRequest("key-2")))
+		require.NotNil(t, first)
+		assert.Same(t, first, second)
+		assert.NotSame(t, first, other)
+	})
+
+	t.Run("incident client", func(t *testing.T) {
+		first := IncidentClientFromContext(ExtractIncidentClientFromHeaders(context.Background(), newRequest("key-1")))
+		second := IncidentClientFromContext(ExtractIncidentClientFromHeaders(context.Background(), newRequest("key-1")))
+		other := IncidentClientFromContext(ExtractIncidentClientFromHeaders(context.Background(), newRequest("key-2")))
+		require.NotNil(t, first)
+		assert.Same(t, first, second)
+		assert.NotSame(t, first, other)
+	})
+}
+
+func TestClientCacheIsBounded(t *testing.T) {
+	var c ClientCache[int]
+	for i := 0; i < maxCachedClients+1; i++ {
+		_, err := c.GetOrCreate("http://grafana", fmt.Sprint(i), func() (int, error) { return i, nil })
+		require.NoError(t, err)
+	}
+	assert.LessOrEqual(t, len(c.clients), maxCachedClients)
+}
+
+func TestClientCacheDoesNotCacheErrors(t *testing.T) {
+	var c ClientCache[int]
+	_, err := c.GetOrCreate("http://grafana", "", func() (int, error) { return 0, errors.New("boom") })
+	assert.Error(t, err)
+	v, err := c.GetOrCreate("http://grafana", "", func() (int, error) { return 1, nil })
+	require.NoError(t, err)
+	assert.Equal(t, 1, v)
+}
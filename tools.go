@@ -1,11 +1,13 @@
 package mcpgrafana
 
 import (
+	"bytes"
 	"context"
 	"encoding/json"
 	"errors"
 	"fmt"
 	"reflect"
+	"sync"
 
 	"github.com/invopop/jsonschema"
 	"github.com/mark3labs/mcp-go/mcp"
@@ -79,63 +81,48 @@ func ConvertTool[T any, R any](name, description string, toolHandler ToolHandler
 		return zero, nil, errors.New("tool handler second argument must be a struct")
 	}
 
-	handler := func(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
-
-		s, err := json.Marshal(request.Params.Arguments)
-		if err != nil {
-			return nil, fmt.Errorf("marshal args: %w", err)
-		}
+	// The result type is fixed by the handler's signature, so work out how it
+	// needs to be handled once here rather than on every call.
+	returnType := handlerType.Out(0)
+	returnKind := returnType.Kind()
+	isNilable := returnKind == reflect.Ptr ||
+		returnKind == reflect.Interface ||
+		returnKind == reflect.Map ||
+		returnKind == reflect.Slice ||
+		returnKind == reflect.Chan ||
+		returnKind == reflect.Func
+	isCallToolResult := returnType.ConvertibleTo(reflect.TypeOf(mcp.CallToolResult{}))
 
-		unmarshaledArgs := reflect.New(argType).Interface()
-		if err := json.Unmarshal([]byte(s), unmarshaledArgs); err != nil {
-			return nil, fmt.Errorf("unmarshal args: %s", err)
-		}
-
-		// Need to dereference the unmarshaled arguments
-		of := reflect.ValueOf(unmarshaledArgs)
-		if of.Kind() != reflect.Ptr || !of.Elem().CanInterface() {
-			return nil, errors.New("arguments must be a struct")
-		}
-
-		args := []reflect.Value{reflect.ValueOf(ctx), of.Elem()}
-
-		output := handlerValue.Call(args)
-		if len(output) != 2 {
-			return nil, errors.New("tool handler must return 2 values")
-		}
-		if !output[0].CanInterface() {
-			return nil, errors.New("tool handler first return value must be interfaceable")
-		}
-
-		// Handle the error return value first
-		var handlerErr error
-		var ok bool
-		if output[1].Kind() == reflect.Interface && !output[1].IsNil() {
-			handlerErr, ok = output[1].Interface().(error)
-			if !ok {
-				return nil, errors.New("tool handler second return value must be error")
+	handler := func(ctx context.Context, request mcp.CallToolRequest) (*mcp.CallToolResult, error) {
+		var args T
+
+		// Tools called without arguments get the zero value of their params
+		// struct, so skip the JSON round trip entirely.
+		if len(request.Params.Arguments) > 0 {
+			s, err := json.Marshal(request.Params.Arguments)
+			if err != nil {
+				return nil, fmt.Errorf("marshal args: %w", err)
+			}
+			if err := json.Unmarshal(s, &args); err != nil {
+				return nil, fmt.Errorf("unmarshal args: %s", err)
 			}
 		}
 
+		// The handler's types are known statically, so call it directly
+		// rather than through reflection.
+		result, err := toolHandler(ctx, args)
+
 		// If there's an error, return nil result and the error
-		if handlerErr != nil {
-			return nil, handlerErr
+		if err != nil {
+			return nil, err
 		}
 
 		// Check if the first return value is nil (only for pointer, interface, map, etc.)
-		isNilable := output[0].Kind() == reflect.Ptr ||
-			output[0].Kind() == reflect.Interface ||
-			output[0].Kind() == reflect.Map ||
-			output[0].Kind() == reflect.Slice ||
-			output[0].Kind() == reflect.Chan ||
-			output[0].Kind() == reflect.Func
-
-		if isNilable && output[0].IsNil() {
+		if isNilable && reflect.ValueOf(&result).Elem().IsNil() {
 			return nil, nil
 		}
 
-		returnVal := output[0].Interface()
-		returnType := output[0].Type()
+		var returnVal any = result
 
 		// Case 1: Already a *mcp.CallToolResult
 		if callResult, ok := returnVal.(*mcp.CallToolResult); ok {
@@ -143,7 +130,7 @@ func ConvertTool[T any, R any](name, description string, toolHandler ToolHandler
 		}
 
 		// Case 2: An mcp.CallToolResult (not a pointer)
-		if returnType.ConvertibleTo(reflect.TypeOf(mcp.CallToolResult{})) {
+		if isCallToolResult {
 			callResult := returnVal.(mcp.CallToolResult)
 			return &callResult, nil
 		}
@@ -164,12 +151,12 @@ func ConvertTool[T any, R any](name, description string, toolHandler ToolHandler
 		}
 
 		// Case 4: Any other type - marshal to JSON
-		jsonBytes, err := json.Marshal(returnVal)
+		text, err := marshalResult(returnVal)
 		if err != nil {
 			return nil, fmt.Errorf("failed to marshal return value: %s", err)
 		}
 
-		return mcp.NewToolResultText(string(jsonBytes)), nil
+		return mcp.NewToolResultText(text), nil
 	}
 
 	jsonSchema := createJSONSchemaFromHandler(toolHandler)
@@ -190,6 +177,37 @@ func ConvertTool[T any, R any](name, description string, toolHandler ToolHandler
 	}, handler, nil
 }
 
+// maxPooledBufferSize is the largest buffer that will be returned to resultBufferPool,
+// so that a single very large result doesn't keep its memory alive indefinitely.
+const maxPooledBufferSize = 1 << 20
+
+var resultBufferPool = sync.Pool{
+	New: func() any { return new(bytes.Buffer) },
+}
+
+// marshalResult encodes a tool result as JSON text.
+//
+// HTML escaping is disabled: results are returned to an MCP client rather than
+// embedded in HTML, and escaping '<', '>' and '&' (common in PromQL and LogQL)
+// only makes the output larger and harder to read.
+func marshalResult(v any) (string, error) {
+	buf := resultBufferPool.Get().(*bytes.Buffer)
+	buf.Reset()
+	defer func() {
+		if buf.Cap() <= maxPooledBufferSize {
+			resultBufferPool.Put(buf)
+		}
+	}()
+
+	enc := json.NewEncoder(buf)
+	enc.SetEscapeHTML(false)
+	if err := enc.Encode(v); err != nil {
+		return "", err
+	}
+	// Encode always appends a newline, which json.Marshal does not.
+	return string(bytes.TrimSuffix(buf.Bytes(), []byte("\n"))), nil
+}
+
 // Creates a full JSON schema from a user provided handler by introspecting the arguments
 func createJSONSchemaFromHandler(handler any) *jsonschema.Schema {
 	handlerValue := reflect.ValueOf(handler)
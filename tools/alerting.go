@@ -68,18 +68,23 @@ func filterAlertRules(rules models.ProvisionedAlertRules, selectors []Selector)
 		return rules, nil
 	}
 
+	// Compile the selectors once up front rather than for every rule.
+	matchers := make([]labels.Selector, 0, len(selectors))
+	for _, selector := range selectors {
+		m, err := selector.Matchers()
+		if err != nil {
+			return nil, fmt.Errorf("filtering alert rules: %w", err)
+		}
+		matchers = append(matchers, m)
+	}
+
 	filteredResult := models.ProvisionedAlertRules{}
 	for _, rule := range rules {
 		if rule == nil {
 			continue
 		}
 
-		match, err := matchesSelectors(*rule, selectors)
-		if err != nil {
-			return nil, fmt.Errorf("filtering alert rules: %w", err)
-		}
-
-		if match {
+		if matchesSelectors(*rule, matchers) {
 			filteredResult = append(filteredResult, rule)
 		}
 	}
@@ -88,19 +93,15 @@ func filterAlertRules(rules models.ProvisionedAlertRules, selectors []Selector)
 }
 
 // matchesSelectors checks if an alert rule matches all provided selectors
-func matchesSelectors(rule models.ProvisionedAlertRule, selectors []Selector) (bool, error) {
+func matchesSelectors(rule models.ProvisionedAlertRule, selectors []labels.Selector) bool {
 	promLabels := labels.FromMap(rule.Labels)
 
 	for _, selector := range selectors {
-		match, err := selector.Matches(promLabels)
-		if err != nil {
-			return false, err
-		}
-		if !match {
-			return false, nil
+		if !selector.Matches(promLabels) {
+			return false
 		}
 	}
-	return true, nil
+	return true
 }
 
 func summarizeAlertRules(alertRules models.ProvisionedAlertRules) []alertRuleSummary {
@@ -11,6 +11,16 @@ import (
 	mcpgrafana "github.com/grafana/mcp-grafana"
 )
 
+// datasourceProxyPath is the path of Grafana's datasource proxy, to which
+// a datasource UID is appended.
+const datasourceProxyPath = "/api/datasources/proxy/uid/"
+
+// datasourceProxyURL returns the base URL for requests to the datasource with
+// the given UID through Grafana's datasource proxy.
+func datasourceProxyURL(grafanaURL, uid string) string {
+	return strings.TrimRight(grafanaURL, "/") + datasourceProxyPath + uid
+}
+
 type ListDatasourcesParams struct {
 	Type string `json:"type,omitempty" jsonschema:"descripton=The type of datasources to search for. For example, 'prometheus', 'loki', 'tempo', etc..."`
 }
@@ -29,29 +39,20 @@ func listDatasources(ctx context.Context, args ListDatasourcesParams) ([]dataSou
 	if err != nil {
 		return nil, fmt.Errorf("list datasources: %w", err)
 	}
-	datasources := filterDatasources(resp.Payload, args.Type)
-	return summarizeDatasources(datasources), nil
+	return summarizeDatasources(resp.Payload, args.Type), nil
 }
 
-// filterDatasources returns only datasources of the specified type `t`. If `t`
-// is an empty string no filtering is done.
-func filterDatasources(datasources models.DataSourceList, t string) models.DataSourceList {
-	if t == "" {
-		return datasources
-	}
-	filtered := models.DataSourceList{}
+// summarizeDatasources returns summaries of the datasources whose type contains `t`,
+// ignoring case, filtering and summarizing in a single pass. If `t` is an empty
+// string no filtering is done.
+func summarizeDatasources(dataSources models.DataSourceList, t string) []dataSourceSummary {
 	t = strings.ToLower(t)
-	for _, ds := range datasources {
-		if strings.Contains(strings.ToLower(ds.Type), t) {
-			filtered = append(filtered, ds)
-		}
-	}
-	return filtered
-}
-
-func summarizeDatasources(dataSources models.DataSourceList) []dataSourceSummary {
+	// The list is usually unfiltered, so size for every datasource.
 	result := make([]dataSourceSummary, 0, len(dataSources))
 	for _, ds := range dataSources {
+		if t != "" && !strings.Contains(strings.ToLower(ds.Type), t) {
+			continue
+		}
 		result = append(result, dataSourceSummary{
 			ID:        ds.ID,
 			UID:       ds.UID,
@@ -15,19 +15,28 @@ type ListIncidentsParams struct {
 	Status string `json:"status" jsonschema:"description=The status of the incidents to include"`
 }
 
+// incidentsQueryString returns the Grafana Incident query string used to list
+// incidents, excluding drills unless drill is set and optionally filtering by
+// status.
+func incidentsQueryString(drill bool, status string) string {
+	switch {
+	case !drill && status == "":
+		return "isdrill:false"
+	case !drill:
+		return "isdrill:false and status:" + status
+	case status == "":
+		return ""
+	default:
+		return "status:" + status
+	}
+}
+
 func listIncidents(ctx context.Context, args ListIncidentsParams) (*incident.QueryIncidentPreviewsResponse, error) {
 	c := mcpgrafana.IncidentClientFromContext(ctx)
 	is := incident.NewIncidentsService(c)
-	query := ""
-	if !args.Drill {
-		query = "isdrill:false"
-	}
-	if args.Status != "" {
-		query += fmt.Sprintf(" and status:%s", args.Status)
-	}
 	incidents, err := is.QueryIncidentPreviews(ctx, incident.QueryIncidentPreviewsRequest{
 		Query: incident.IncidentPreviewsQuery{
-			QueryString:    query,
+			QueryString:    incidentsQueryString(args.Drill, args.Status),
 			OrderDirection: "DESC",
 			Limit:          args.Limit,
 		},
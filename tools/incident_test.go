@@ -18,6 +18,13 @@ func newIncidentTestContext() context.Context {
 	return mcpgrafana.WithIncidentClient(context.Background(), client)
 }
 
+func TestIncidentsQueryString(t *testing.T) {
+	assert.Equal(t, "isdrill:false", incidentsQueryString(false, ""))
+	assert.Equal(t, "isdrill:false and status:active", incidentsQueryString(false, "active"))
+	assert.Equal(t, "", incidentsQueryString(true, ""))
+	assert.Equal(t, "status:resolved", incidentsQueryString(true, "resolved"))
+}
+
 func TestIncidentTools(t *testing.T) {
 	t.Run("list incidents", func(t *testing.T) {
 		ctx := newIncidentTestContext()
@@ -11,6 +11,7 @@ import (
 	"strconv"
 	"strings"
 	"time"
+	"unicode/utf8"
 
 	mcpgrafana "github.com/grafana/mcp-grafana"
 	"github.com/mark3labs/mcp-go/server"
@@ -22,11 +23,20 @@ const (
 
 	// MaxLokiLogLimit is the maximum number of log lines that can be requested
 	MaxLokiLogLimit = 100
+
+	// maxLokiResponseBytes is the maximum size of a Loki response body that will be read
+	maxLokiResponseBytes = 1024 * 1024 * 48
+
+	// maxLokiErrorBodyBytes is the maximum size of an error response body that will be read
+	maxLokiErrorBodyBytes = 4096
 )
 
 type Client struct {
 	httpClient *http.Client
 	baseURL    string
+	// authorization is the Authorization header value sent with every
+	// request, or empty if no API key is configured.
+	authorization string
 }
 
 // LabelResponse represents the http json response to a label query
@@ -45,18 +55,17 @@ type Stats struct {
 
 func newLokiClient(ctx context.Context, uid string) (*Client, error) {
 	grafanaURL, apiKey := mcpgrafana.GrafanaURLFromContext(ctx), mcpgrafana.GrafanaAPIKeyFromContext(ctx)
-	url := fmt.Sprintf("%s/api/datasources/proxy/uid/%s", strings.TrimRight(grafanaURL, "/"), uid)
+	url := datasourceProxyURL(grafanaURL, uid)
 
-	client := &http.Client{
-		Transport: &authRoundTripper{
-			apiKey:     apiKey,
-			underlying: http.DefaultTransport,
-		},
+	var authorization string
+	if apiKey != "" {
+		authorization = "Bearer " + apiKey
 	}
 
 	return &Client{
-		httpClient: client,
-		baseURL:    url,
+		httpClient:    &http.Client{Transport: mcpgrafana.SharedRoundTripper()},
+		baseURL:       url,
+		authorization: authorization,
 	}, nil
 }
 
@@ -75,20 +84,19 @@ func (c *Client) buildURL(urlPath string) string {
 // makeRequest makes an HTTP request to the Loki API and returns the response body
 func (c *Client) makeRequest(ctx context.Context, method, urlPath string, params url.Values) ([]byte, error) {
 	fullURL := c.buildURL(urlPath)
-
-	u, err := url.Parse(fullURL)
-	if err != nil {
-		return nil, fmt.Errorf("parsing URL: %w", err)
-	}
-
-	if params != nil {
-		u.RawQuery = params.Encode()
+	// Append the query directly rather than parsing the URL only to
+	// serialize it again; NewRequestWithContext parses it once.
+	if len(params) > 0 {
+		fullURL += "?" + params.Encode()
 	}
 
-	req, err := http.NewRequestWithContext(ctx, method, u.String(), nil)
+	req, err := http.NewRequestWithContext(ctx, method, fullURL, nil)
 	if err != nil {
 		return nil, fmt.Errorf("creating request: %w", err)
 	}
+	if c.authorization != "" {
+		req.Header.Set("Authorization", c.authorization)
+	}
 
 	resp, err := c.httpClient.Do(req)
 	if err != nil {
@@ -98,13 +106,13 @@ func (c *Client) makeRequest(ctx context.Context, method, urlPath string, params
 
 	// Check for non-200 status code
 	if resp.StatusCode != http.StatusOK {
-		bodyBytes, _ := io.ReadAll(resp.Body)
+		// Only the start of the body is needed for the error message
+		bodyBytes, _ := io.ReadAll(io.LimitReader(resp.Body, maxLokiErrorBodyBytes))
 		return nil, fmt.Errorf("Loki API returned status code %d: %s", resp.StatusCode, string(bodyBytes))
 	}
 
 	// Read the response body with a limit to prevent memory issues
-	body := io.LimitReader(resp.Body, 1024*1024*48)
-	bodyBytes, err := io.ReadAll(body)
+	bodyBytes, err := readResponseBody(resp, maxLokiResponseBytes)
 	if err != nil {
 		return nil, fmt.Errorf("reading response body: %w", err)
 	}
@@ -118,6 +126,20 @@ func (c *Client) makeRequest(ctx context.Context, method, urlPath string, params
 	return bytes.TrimSpace(bodyBytes), nil
 }
 
+// readResponseBody reads up to limit bytes of the response body. When the
+// server reports the body size up front, the buffer is allocated once at
+// that size rather than grown repeatedly while reading.
+func readResponseBody(resp *http.Response, limit int64) ([]byte, error) {
+	body := io.LimitReader(resp.Body, limit)
+	if resp.ContentLength <= 0 || resp.ContentLength > limit {
+		return io.ReadAll(body)
+	}
+	var buf bytes.Buffer
+	buf.Grow(int(resp.ContentLength) + bytes.MinRead)
+	_, err := buf.ReadFrom(body)
+	return buf.Bytes(), err
+}
+
 // fetchData is a generic method to fetch data from Loki API
 func (c *Client) fetchData(ctx context.Context, urlPath string, startRFC3339, endRFC3339 string) ([]string, error) {
 	params := url.Values{}
@@ -156,24 +178,6 @@ func (c *Client) fetchData(ctx context.Context, urlPath string, startRFC3339, en
 	return labelResponse.Data, nil
 }
 
-type authRoundTripper struct {
-	apiKey     string
-	underlying http.RoundTripper
-}
-
-func (rt *authRoundTripper) RoundTrip(req *http.Request) (*http.Response, error) {
-	if rt.apiKey != "" {
-		req.Header.Set("Authorization", "Bearer "+rt.apiKey)
-	}
-
-	resp, err := rt.underlying.RoundTrip(req)
-	if err != nil {
-		return nil, err
-	}
-
-	return resp, nil
-}
-
 // ListLokiLabelNamesParams defines the parameters for listing Loki label names
 type ListLokiLabelNamesParams struct {
 	DatasourceUID string `json:"datasourceUid" jsonschema:"required,description=The UID of the datasource to query"`
@@ -223,7 +227,7 @@ func listLokiLabelValues(ctx context.Context, args ListLokiLabelValuesParams) ([
 	}
 
 	// Use the client's fetchData method
-	urlPath := fmt.Sprintf("/loki/api/v1/label/%s/values", args.LabelName)
+	urlPath := "/loki/api/v1/label/" + args.LabelName + "/values"
 
 	result, err := client.fetchData(ctx, urlPath, args.StartRFC3339, args.EndRFC3339)
 	if err != nil {
@@ -247,8 +251,8 @@ var ListLokiLabelValues = mcpgrafana.MustTool(
 
 // LogStream represents a stream of log entries from Loki
 type LogStream struct {
-	Stream map[string]string   `json:"stream"`
-	Values [][]json.RawMessage `json:"values"` // [timestamp, value] where value can be string or number
+	Stream map[string]string    `json:"stream"`
+	Values [][2]json.RawMessage `json:"values"` // [timestamp, value] where value can be string or number
 }
 
 // QueryRangeResponse represents the response from Loki's query_range API
@@ -261,53 +265,45 @@ type QueryRangeResponse struct {
 }
 
 // addTimeRangeParams adds start and end time parameters to the URL values
-// It handles conversion from RFC3339 to Unix nanoseconds
-func addTimeRangeParams(params url.Values, startRFC3339, endRFC3339 string) error {
+// as Unix nanoseconds
+func addTimeRangeParams(params url.Values, start, end time.Time) {
+	params.Add("start", strconv.FormatInt(start.UnixNano(), 10))
+	params.Add("end", strconv.FormatInt(end.UnixNano(), 10))
+}
+
+// getDefaultTimeRange parses the given RFC3339 start and end times, using
+// defaults for any that are not provided: 1 hour ago for the start time and
+// now for the end time
+func getDefaultTimeRange(startRFC3339, endRFC3339 string) (time.Time, time.Time, error) {
+	now := time.Now()
+	start, end := now.Add(-1*time.Hour), now
 	if startRFC3339 != "" {
-		startTime, err := time.Parse(time.RFC3339, startRFC3339)
+		t, err := time.Parse(time.RFC3339, startRFC3339)
 		if err != nil {
-			return fmt.Errorf("parsing start time: %w", err)
+			return time.Time{}, time.Time{}, fmt.Errorf("parsing start time: %w", err)
 		}
-		params.Add("start", fmt.Sprintf("%d", startTime.UnixNano()))
+		start = t
 	}
-
 	if endRFC3339 != "" {
-		endTime, err := time.Parse(time.RFC3339, endRFC3339)
+		t, err := time.Parse(time.RFC3339, endRFC3339)
 		if err != nil {
-			return fmt.Errorf("parsing end time: %w", err)
+			return time.Time{}, time.Time{}, fmt.Errorf("parsing end time: %w", err)
 		}
-		params.Add("end", fmt.Sprintf("%d", endTime.UnixNano()))
+		end = t
 	}
-
-	return nil
-}
-
-// getDefaultTimeRange returns default start and end times if not provided
-// Returns start time (1 hour ago) and end time (now) in RFC3339 format
-func getDefaultTimeRange(startRFC3339, endRFC3339 string) (string, string) {
-	if startRFC3339 == "" {
-		// Default to 1 hour ago if not specified
-		startRFC3339 = time.Now().Add(-1 * time.Hour).Format(time.RFC3339)
-	}
-	if endRFC3339 == "" {
-		// Default to now if not specified
-		endRFC3339 = time.Now().Format(time.RFC3339)
-	}
-	return startRFC3339, endRFC3339
+	return start, end, nil
 }
 
 // fetchLogs is a method to fetch logs from Loki API
-func (c *Client) fetchLogs(ctx context.Context, query, startRFC3339, endRFC3339 string, limit int, direction string) ([]LogStream, error) {
+func (c *Client) fetchLogs(ctx context.Context, query string, start, end time.Time, limit int, direction string) ([]LogStream, error) {
 	params := url.Values{}
 	params.Add("query", query)
 
 	// Add time range parameters
-	if err := addTimeRangeParams(params, startRFC3339, endRFC3339); err != nil {
-		return nil, err
-	}
+	addTimeRangeParams(params, start, end)
 
 	if limit > 0 {
-		params.Add("limit", fmt.Sprintf("%d", limit))
+		params.Add("limit", strconv.Itoa(limit))
 	}
 
 	if direction != "" {
@@ -350,6 +346,34 @@ type LogEntry struct {
 	Labels    map[string]string `json:"labels"`
 }
 
+// unquoteJSONString decodes a JSON string value. Loki returns log lines and
+// sample values as JSON strings, most of which contain no escape sequences,
+// so those are sliced out directly; anything else goes through
+// json.Unmarshal.
+func unquoteJSONString(raw json.RawMessage) (string, error) {
+	if len(raw) >= 2 && raw[0] == '"' && raw[len(raw)-1] == '"' {
+		inner := raw[1 : len(raw)-1]
+		if isPlainJSONString(inner) {
+			return string(inner), nil
+		}
+	}
+	var s string
+	err := json.Unmarshal(raw, &s)
+	return s, err
+}
+
+// isPlainJSONString reports whether b, the contents of a JSON string, can be
+// used as is: it is valid UTF-8 and contains no quotes, escapes or control
+// characters.
+func isPlainJSONString(b []byte) bool {
+	for _, c := range b {
+		if c < 0x20 || c == '"' || c == '\\' {
+			return false
+		}
+	}
+	return utf8.Valid(b)
+}
+
 // enforceLogLimit ensures a log limit value is within acceptable bounds
 func enforceLogLimit(requestedLimit int) int {
 	if requestedLimit <= 0 {
@@ -369,7 +393,10 @@ func queryLokiLogs(ctx context.Context, args QueryLokiLogsParams) ([]LogEntry, e
 	}
 
 	// Get default time range if not provided
-	startTime, endTime := getDefaultTimeRange(args.StartRFC3339, args.EndRFC3339)
+	startTime, endTime, err := getDefaultTimeRange(args.StartRFC3339, args.EndRFC3339)
+	if err != nil {
+		return nil, err
+	}
 
 	// Apply limit constraints
 	limit := enforceLogLimit(args.Limit)
@@ -391,10 +418,15 @@ func queryLokiLogs(ctx context.Context, args QueryLokiLogsParams) ([]LogEntry, e
 	}
 
 	// Convert the streams to a flat list of log entries
-	var entries []LogEntry
+	n := 0
+	for _, stream := range streams {
+		n += len(stream.Values)
+	}
+	entries := make([]LogEntry, 0, n)
 	for _, stream := range streams {
 		for _, value := range stream.Values {
-			if len(value) >= 2 {
+			// Skip malformed pairs that are missing a value
+			if value[1] != nil {
 				entry := LogEntry{
 					Timestamp: string(value[0]),
 					Labels:    stream.Stream,
@@ -403,8 +435,7 @@ func queryLokiLogs(ctx context.Context, args QueryLokiLogsParams) ([]LogEntry, e
 				// Handle metric queries (numeric values) vs log queries
 				if stream.Stream["__type__"] == "metrics" {
 					// For metric queries, parse the value as a number
-					var numStr string
-					if err := json.Unmarshal(value[1], &numStr); err == nil {
+					if numStr, err := unquoteJSONString(value[1]); err == nil {
 						if v, err := strconv.ParseFloat(numStr, 64); err == nil {
 							entry.Value = &v
 						} else {
@@ -423,8 +454,7 @@ func queryLokiLogs(ctx context.Context, args QueryLokiLogsParams) ([]LogEntry, e
 					}
 				} else {
 					// For log queries, parse the value as a string
-					var logLine string
-					if err := json.Unmarshal(value[1], &logLine); err == nil {
+					if logLine, err := unquoteJSONString(value[1]); err == nil {
 						entry.Line = logLine
 					} else {
 						// Skip invalid log lines
@@ -453,14 +483,12 @@ var QueryLokiLogs = mcpgrafana.MustTool(
 )
 
 // fetchStats is a method to fetch stats data from Loki API
-func (c *Client) fetchStats(ctx context.Context, query, startRFC3339, endRFC3339 string) (*Stats, error) {
+func (c *Client) fetchStats(ctx context.Context, query string, start, end time.Time) (*Stats, error) {
 	params := url.Values{}
 	params.Add("query", query)
 
 	// Add time range parameters
-	if err := addTimeRangeParams(params, startRFC3339, endRFC3339); err != nil {
-		return nil, err
-	}
+	addTimeRangeParams(params, start, end)
 
 	bodyBytes, err := c.makeRequest(ctx, "GET", "/loki/api/v1/index/stats", params)
 	if err != nil {
@@ -492,7 +520,10 @@ func queryLokiStats(ctx context.Context, args QueryLokiStatsParams) (*Stats, err
 	}
 
 	// Get default time range if not provided
-	startTime, endTime := getDefaultTimeRange(args.StartRFC3339, args.EndRFC3339)
+	startTime, endTime, err := getDefaultTimeRange(args.StartRFC3339, args.EndRFC3339)
+	if err != nil {
+		return nil, err
+	}
 
 	stats, err := client.fetchStats(ctx, args.LogQL, startTime, endTime)
 	if err != nil {
@@ -0,0 +1,32 @@
+//go:build unit
+// +build unit
+
+package tools
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+func TestUnquoteJSONString(t *testing.T) {
+	for _, tc := range []struct {
+		raw      string
+		expected string
+	}{
+		{`"plain log line"`, "plain log line"},
+		{`"level=info msg=\"done\""`, `level=info msg="done"`},
+		{`"tab\there"`, "tab\there"},
+		{`"café"`, "café"},
+		{`"caf\u00e9"`, "café"},
+		{`""`, ""},
+	} {
+		s, err := unquoteJSONString([]byte(tc.raw))
+		require.NoError(t, err, tc.raw)
+		assert.Equal(t, tc.expected, s)
+	}
+
+	_, err := unquoteJSONString([]byte(`123`))
+	assert.Error(t, err)
+}
@@ -12,12 +12,15 @@ import (
 	"github.com/mark3labs/mcp-go/server"
 )
 
+// onCallSettingsPath is the path of the IRM plugin settings endpoint.
+const onCallSettingsPath = "/api/plugins/grafana-irm-app/settings"
+
 // getOnCallURLFromSettings retrieves the OnCall API URL from the Grafana settings endpoint.
 // It makes a GET request to <grafana-url>/api/plugins/grafana-irm-app/settings and extracts
 // the OnCall URL from the jsonData.onCallApiUrl field in the response.
 // Returns the OnCall URL if found, or an error if the URL cannot be retrieved.
 func getOnCallURLFromSettings(ctx context.Context, grafanaURL, grafanaAPIKey string) (string, error) {
-	settingsURL := fmt.Sprintf("%s/api/plugins/grafana-irm-app/settings", strings.TrimRight(grafanaURL, "/"))
+	settingsURL := strings.TrimRight(grafanaURL, "/") + onCallSettingsPath
 
 	req, err := http.NewRequestWithContext(ctx, "GET", settingsURL, nil)
 	if err != nil {
@@ -28,7 +31,8 @@ func getOnCallURLFromSettings(ctx context.Context, grafanaURL, grafanaAPIKey str
 		req.Header.Set("Authorization", "Bearer "+grafanaAPIKey)
 	}
 
-	resp, err := http.DefaultClient.Do(req)
+	client := &http.Client{Transport: mcpgrafana.SharedRoundTripper()}
+	resp, err := client.Do(req)
 	if err != nil {
 		return "", fmt.Errorf("fetching settings: %w", err)
 	}
@@ -3,8 +3,11 @@ package tools
 import (
 	"context"
 	"fmt"
+	"net/http"
 	"regexp"
+	"strconv"
 	"strings"
+	"sync"
 	"time"
 
 	mcpgrafana "github.com/grafana/mcp-grafana"
@@ -26,23 +29,32 @@ var (
 	}
 )
 
+// promClients caches Prometheus clients by datasource URL and API key.
+var promClients mcpgrafana.ClientCache[promv1.API]
+
+// promClientFromContext returns a Prometheus client for the datasource with
+// the given UID, using the Grafana URL and API key from the context. Clients
+// are cached by datasource URL and API key, so repeated tool calls against the
+// same datasource reuse one client.
 func promClientFromContext(ctx context.Context, uid string) (promv1.API, error) {
 	grafanaURL, apiKey := mcpgrafana.GrafanaURLFromContext(ctx), mcpgrafana.GrafanaAPIKeyFromContext(ctx)
-	url := fmt.Sprintf("%s/api/datasources/proxy/uid/%s", strings.TrimRight(grafanaURL, "/"), uid)
-	rt := api.DefaultRoundTripper
-	if apiKey != "" {
-		rt = config.NewAuthorizationCredentialsRoundTripper(
-			"Bearer", config.NewInlineSecret(apiKey), rt,
-		)
-	}
-	c, err := api.NewClient(api.Config{
-		Address:      url,
-		RoundTripper: rt,
+	url := datasourceProxyURL(grafanaURL, uid)
+	return promClients.GetOrCreate(url, apiKey, func() (promv1.API, error) {
+		var rt http.RoundTripper = mcpgrafana.SharedRoundTripper()
+		if apiKey != "" {
+			rt = config.NewAuthorizationCredentialsRoundTripper(
+				"Bearer", config.NewInlineSecret(apiKey), rt,
+			)
+		}
+		c, err := api.NewClient(api.Config{
+			Address:      url,
+			RoundTripper: rt,
+		})
+		if err != nil {
+			return nil, fmt.Errorf("creating Prometheus client: %w", err)
+		}
+		return promv1.NewAPI(c), nil
 	})
-	if err != nil {
-		return nil, fmt.Errorf("creating Prometheus client: %w", err)
-	}
-	return promv1.NewAPI(c), nil
 }
 
 type ListPrometheusMetricMetadataParams struct {
@@ -63,7 +75,7 @@ func listPrometheusMetricMetadata(ctx context.Context, args ListPrometheusMetric
 		limit = 10
 	}
 
-	metadata, err := promClient.Metadata(ctx, args.Metric, fmt.Sprintf("%d", limit))
+	metadata, err := promClient.Metadata(ctx, args.Metric, strconv.Itoa(limit))
 	if err != nil {
 		return nil, fmt.Errorf("listing Prometheus metric metadata: %w", err)
 	}
@@ -146,6 +158,17 @@ type ListPrometheusMetricNamesParams struct {
 }
 
 func listPrometheusMetricNames(ctx context.Context, args ListPrometheusMetricNamesParams) ([]string, error) {
+	// Compile the regex first, so that an invalid one fails without a
+	// round trip to the datasource.
+	var re *regexp.Regexp
+	if args.Regex != "" {
+		var err error
+		re, err = compileRegex(args.Regex)
+		if err != nil {
+			return nil, fmt.Errorf("compiling regex: %w", err)
+		}
+	}
+
 	promClient, err := promClientFromContext(ctx, args.DatasourceUID)
 	if err != nil {
 		return nil, fmt.Errorf("getting Prometheus client: %w", err)
@@ -161,42 +184,77 @@ func listPrometheusMetricNames(ctx context.Context, args ListPrometheusMetricNam
 		page = 1
 	}
 
-	// Get all metric names by querying for __name__ label values
-	labelValues, _, err := promClient.LabelValues(ctx, "__name__", nil, time.Time{}, time.Time{})
+	// Get metric names by querying for __name__ label values. Without a regex
+	// only the names up to the end of the requested page are needed, so ask
+	// Prometheus not to send the rest. Servers that don't support the limit
+	// parameter ignore it, and the names are paginated below either way.
+	var opts []promv1.Option
+	if args.Regex == "" && page > 0 && limit > 0 {
+		opts = append(opts, promv1.WithLimit(uint64(page*limit)))
+	}
+	labelValues, _, err := promClient.LabelValues(ctx, "__name__", nil, time.Time{}, time.Time{}, opts...)
 	if err != nil {
 		return nil, fmt.Errorf("listing Prometheus metric names: %w", err)
 	}
 
-	// Filter by regex if provided
+	return filterMetricNames(labelValues, re, page, limit), nil
+}
+
+// filterMetricNames returns the given page of metric names matching re, or of
+// all names if re is nil. Pagination is applied while filtering, so matching
+// stops as soon as the page is full.
+func filterMetricNames(names model.LabelValues, re *regexp.Regexp, page, limit int) []string {
+	skip := (page - 1) * limit
 	matches := []string{}
-	if args.Regex != "" {
-		re, err := regexp.Compile(args.Regex)
-		if err != nil {
-			return nil, fmt.Errorf("compiling regex: %w", err)
+	for _, val := range names {
+		if len(matches) >= limit {
+			break
 		}
-		for _, val := range labelValues {
-			if re.MatchString(string(val)) {
-				matches = append(matches, string(val))
-			}
+		name := string(val)
+		if re != nil && !re.MatchString(name) {
+			continue
 		}
-	} else {
-		for _, val := range labelValues {
-			matches = append(matches, string(val))
+		if skip > 0 {
+			skip--
+			continue
 		}
+		matches = append(matches, name)
 	}
+	return matches
+}
+
+// maxCachedRegexes bounds the number of compiled regular expressions kept by
+// compileRegex.
+const maxCachedRegexes = 256
 
-	// Apply pagination
-	start := (page - 1) * limit
-	end := start + limit
-	if start >= len(matches) {
-		matches = []string{}
-	} else if end > len(matches) {
-		matches = matches[start:]
-	} else {
-		matches = matches[start:end]
+var (
+	regexCacheMu sync.Mutex
+	regexCache   = make(map[string]*regexp.Regexp)
+)
+
+// compileRegex compiles expr, reusing the result from earlier calls with the
+// same expression. Compiled expressions are safe for concurrent use, and
+// clients tend to repeat the same few patterns while exploring metrics.
+func compileRegex(expr string) (*regexp.Regexp, error) {
+	regexCacheMu.Lock()
+	re, ok := regexCache[expr]
+	regexCacheMu.Unlock()
+	if ok {
+		return re, nil
+	}
+
+	re, err := regexp.Compile(expr)
+	if err != nil {
+		return nil, err
 	}
 
-	return matches, nil
+	regexCacheMu.Lock()
+	defer regexCacheMu.Unlock()
+	if len(regexCache) >= maxCachedRegexes {
+		regexCache = make(map[string]*regexp.Regexp)
+	}
+	regexCache[expr] = re
+	return re, nil
 }
 
 var ListPrometheusMetricNames = mcpgrafana.MustTool(
@@ -216,42 +274,100 @@ type Selector struct {
 }
 
 func (s Selector) String() string {
+	// Size the buffer up front: braces, plus name, type, quoted value and
+	// separator for each filter.
+	n := 2
+	for _, f := range s.Filters {
+		n += len(f.Name) + len(f.Type) + len(f.Value) + 5
+	}
 	b := strings.Builder{}
-	b.WriteRune('{')
+	b.Grow(n)
+	b.WriteByte('{')
 	for i, f := range s.Filters {
-		if f.Type == "" {
-			f.Type = "="
-		}
-		b.WriteString(fmt.Sprintf(`%s%s'%s'`, f.Name, f.Type, f.Value))
-		if i < len(s.Filters)-1 {
+		if i > 0 {
 			b.WriteString(", ")
 		}
+		b.WriteString(f.Name)
+		if f.Type == "" {
+			b.WriteByte('=')
+		} else {
+			b.WriteString(f.Type)
+		}
+		b.WriteByte('\'')
+		b.WriteString(f.Value)
+		b.WriteByte('\'')
 	}
-	b.WriteRune('}')
+	b.WriteByte('}')
 	return b.String()
 }
 
-// Matches runs the matchers against the given labels and returns whether they match the selector.
-func (s Selector) Matches(lbls labels.Labels) (bool, error) {
+// Matchers compiles the selector's filters into Prometheus label matchers.
+//
+// Compiling a matcher can involve compiling a regular expression, so callers
+// matching many label sets against the same selector should call Matchers
+// once and reuse the result.
+func (s Selector) Matchers() (labels.Selector, error) {
 	matchers := make(labels.Selector, 0, len(s.Filters))
 
 	for _, filter := range s.Filters {
 		matchType, ok := matchTypeMap[filter.Type]
 		if !ok {
-			return false, fmt.Errorf("invalid matcher type: %s", filter.Type)
+			return nil, fmt.Errorf("invalid matcher type: %s", filter.Type)
 		}
 
 		matcher, err := labels.NewMatcher(matchType, filter.Name, filter.Value)
 		if err != nil {
-			return false, fmt.Errorf("creating matcher: %w", err)
+			return nil, fmt.Errorf("creating matcher: %w", err)
 		}
 
 		matchers = append(matchers, matcher)
 	}
 
+	return matchers, nil
+}
+
+// Matches runs the matchers against the given labels and returns whether they match the selector.
+func (s Selector) Matches(lbls labels.Labels) (bool, error) {
+	matchers, err := s.Matchers()
+	if err != nil {
+		return false, err
+	}
+
 	return matchers.Matches(lbls), nil
 }
 
+// parseOptionalTimeRange parses the optional RFC3339 start and end times accepted
+// by the Prometheus metadata tools. Empty values are returned as zero times,
+// which the Prometheus client omits from the request.
+func parseOptionalTimeRange(startRFC3339, endRFC3339 string) (time.Time, time.Time, error) {
+	var startTime, endTime time.Time
+	var err error
+	if startRFC3339 != "" {
+		if startTime, err = time.Parse(time.RFC3339, startRFC3339); err != nil {
+			return time.Time{}, time.Time{}, fmt.Errorf("parsing start time: %w", err)
+		}
+	}
+	if endRFC3339 != "" {
+		if endTime, err = time.Parse(time.RFC3339, endRFC3339); err != nil {
+			return time.Time{}, time.Time{}, fmt.Errorf("parsing end time: %w", err)
+		}
+	}
+	return startTime, endTime, nil
+}
+
+// selectorStrings renders selectors as series selector strings suitable for
+// the `match[]` parameter of the Prometheus API.
+func selectorStrings(selectors []Selector) []string {
+	if len(selectors) == 0 {
+		return nil
+	}
+	matchers := make([]string, 0, len(selectors))
+	for _, s := range selectors {
+		matchers = append(matchers, s.String())
+	}
+	return matchers
+}
+
 type ListPrometheusLabelNamesParams struct {
 	DatasourceUID string     `json:"datasourceUid" jsonschema:"required,description=The UID of the datasource to query"`
 	Matches       []Selector `json:"matches,omitempty" jsonschema:"description=Optionally, a list of label matchers to filter the results by"`
@@ -271,22 +387,11 @@ func listPrometheusLabelNames(ctx context.Context, args ListPrometheusLabelNames
 		limit = 100
 	}
 
-	var startTime, endTime time.Time
-	if args.StartRFC3339 != "" {
-		if startTime, err = time.Parse(time.RFC3339, args.StartRFC3339); err != nil {
-			return nil, fmt.Errorf("parsing start time: %w", err)
-		}
-	}
-	if args.EndRFC3339 != "" {
-		if endTime, err = time.Parse(time.RFC3339, args.EndRFC3339); err != nil {
-			return nil, fmt.Errorf("parsing end time: %w", err)
-		}
-	}
-
-	var matchers []string
-	for _, m := range args.Matches {
-		matchers = append(matchers, m.String())
+	startTime, endTime, err := parseOptionalTimeRange(args.StartRFC3339, args.EndRFC3339)
+	if err != nil {
+		return nil, err
 	}
+	matchers := selectorStrings(args.Matches)
 
 	labelNames, _, err := promClient.LabelNames(ctx, matchers, startTime, endTime)
 	if err != nil {
@@ -327,22 +432,11 @@ func listPrometheusLabelValues(ctx context.Context, args ListPrometheusLabelValu
 		limit = 100
 	}
 
-	var startTime, endTime time.Time
-	if args.StartRFC3339 != "" {
-		if startTime, err = time.Parse(time.RFC3339, args.StartRFC3339); err != nil {
-			return nil, fmt.Errorf("parsing start time: %w", err)
-		}
-	}
-	if args.EndRFC3339 != "" {
-		if endTime, err = time.Parse(time.RFC3339, args.EndRFC3339); err != nil {
-			return nil, fmt.Errorf("parsing end time: %w", err)
-		}
-	}
-
-	var matchers []string
-	for _, m := range args.Matches {
-		matchers = append(matchers, m.String())
+	startTime, endTime, err := parseOptionalTimeRange(args.StartRFC3339, args.EndRFC3339)
+	if err != nil {
+		return nil, err
 	}
+	matchers := selectorStrings(args.Matches)
 
 	labelValues, _, err := promClient.LabelValues(ctx, args.LabelName, matchers, startTime, endTime)
 	if err != nil {
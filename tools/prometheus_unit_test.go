@@ -0,0 +1,63 @@
+//go:build unit
+// +build unit
+
+package tools
+
+import (
+	"testing"
+	"time"
+
+	"github.com/prometheus/common/model"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+func TestParseOptionalTimeRange(t *testing.T) {
+	start, end, err := parseOptionalTimeRange("", "")
+	require.NoError(t, err)
+	assert.True(t, start.IsZero())
+	assert.True(t, end.IsZero())
+
+	start, end, err = parseOptionalTimeRange("2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z")
+	require.NoError(t, err)
+	assert.Equal(t, time.Date(2025, 1, 1, 0, 0, 0, 0, time.UTC), start.UTC())
+	assert.Equal(t, time.Date(2025, 1, 1, 1, 0, 0, 0, time.UTC), end.UTC())
+
+	_, _, err = parseOptionalTimeRange("yesterday", "")
+	assert.ErrorContains(t, err, "parsing start time")
+	_, _, err = parseOptionalTimeRange("", "tomorrow")
+	assert.ErrorContains(t, err, "parsing end time")
+}
+
+func TestFilterMetricNames(t *testing.T) {
+	names := model.LabelValues{"go_goroutines", "go_threads", "process_cpu_seconds_total", "go_gc_duration_seconds", "up"}
+
+	assert.Equal(t, []string{"go_goroutines", "go_threads"}, filterMetricNames(names, nil, 1, 2))
+	assert.Equal(t, []string{"up"}, filterMetricNames(names, nil, 3, 2))
+	assert.Equal(t, []string{}, filterMetricNames(names, nil, 4, 2))
+
+	re, err := compileRegex("^go_")
+	require.NoError(t, err)
+	assert.Equal(t, []string{"go_goroutines", "go_threads"}, filterMetricNames(names, re, 1, 2))
+	assert.Equal(t, []string{"go_gc_duration_seconds"}, filterMetricNames(names, re, 2, 2))
+
+	cached, err := compileRegex("^go_")
+	require.NoError(t, err)
+	assert.Same(t, re, cached)
+
+	_, err = compileRegex("(")
+	assert.Error(t, err)
+}
+
+func TestSelectorString(t *testing.T) {
+	assert.Equal(t, "{}", Selector{}.String())
+	assert.Equal(t, "{job='prometheus'}", Selector{
+		Filters: []LabelMatcher{{Name: "job", Value: "prometheus"}},
+	}.String())
+	assert.Equal(t, "{job!='prometheus', instance=~'localhost:.*'}", Selector{
+		Filters: []LabelMatcher{
+			{Name: "job", Type: "!=", Value: "prometheus"},
+			{Name: "instance", Type: "=~", Value: "localhost:.*"},
+		},
+	}.String())
+}
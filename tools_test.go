@@ -5,6 +5,7 @@ package mcpgrafana
 
 import (
 	"context"
+	"encoding/json"
 	"errors"
 	"testing"
 
@@ -405,6 +406,27 @@ func TestConvertTool(t *testing.T) {
 		_, err = handler(ctx, errorRequest)
 		assert.Error(t, err)
 		assert.Equal(t, "test error", err.Error())
+
+		// Test missing arguments produce zero-valued params
+		noArgsRequest := mcp.CallToolRequest{
+			Params: struct {
+				Name      string         `json:"name"`
+				Arguments map[string]any `json:"arguments,omitempty"`
+				Meta      *struct {
+					ProgressToken mcp.ProgressToken `json:"progressToken,omitempty"`
+				} `json:"_meta,omitempty"`
+			}{
+				Name: "struct_tool",
+			},
+		}
+
+		result, err = handler(ctx, noArgsRequest)
+		require.NoError(t, err)
+		require.Len(t, result.Content, 1)
+		resultString, ok = result.Content[0].(mcp.TextContent)
+		require.True(t, ok)
+		assert.Contains(t, resultString.Text, `"name":""`)
+		assert.Contains(t, resultString.Text, `"value":0`)
 	})
 
 	t.Run("struct pointer return type", func(t *testing.T) {
@@ -558,3 +580,20 @@ func TestCreateJSONSchemaFromHandler(t *testing.T) {
 	assert.Equal(t, "boolean", optionalProperty.Type)
 	assert.Equal(t, "An optional parameter", optionalProperty.Description)
 }
+
+func TestMarshalResult(t *testing.T) {
+	t.Run("matches json.Marshal", func(t *testing.T) {
+		v := TestResult{Name: "test", Value: 65}
+		expected, err := json.Marshal(v)
+		require.NoError(t, err)
+		text, err := marshalResult(v)
+		require.NoError(t, err)
+		assert.Equal(t, string(expected), text)
+	})
+
+	t.Run("does not escape HTML", func(t *testing.T) {
+		text, err := marshalResult(map[string]string{"expr": `rate(x[5m]) > 0 && y < 1`})
+		require.NoError(t, err)
+		assert.Equal(t, `{"expr":"rate(x[5m]) > 0 && y < 1"}`, text)
+	})
+}
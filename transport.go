@@ -0,0 +1,195 @@
+package mcpgrafana
+
+import (
+	"context"
+	"io"
+	"log/slog"
+	"net/http"
+	"os"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+const (
+	maxIdleConnsEnvVar        = "GRAFANA_MAX_IDLE_CONNS"
+	maxIdleConnsPerHostEnvVar = "GRAFANA_MAX_IDLE_CONNS_PER_HOST"
+	maxConnsPerHostEnvVar     = "GRAFANA_MAX_CONNS_PER_HOST"
+	idleConnTimeoutEnvVar     = "GRAFANA_IDLE_CONN_TIMEOUT"
+
+	defaultMaxIdleConns        = 100
+	defaultMaxIdleConnsPerHost = 20
+	defaultMaxConnsPerHost     = 100
+	defaultIdleConnTimeout     = 30 * time.Second
+
+	// warmUpTimeout bounds how long WarmUpConnections waits for Grafana.
+	warmUpTimeout = 5 * time.Second
+)
+
+// httpTransportConfig holds the connection pool settings used for HTTP requests
+// made to Grafana and the datasources proxied through it.
+type httpTransportConfig struct {
+	// MaxIdleConns is the maximum number of idle connections kept across all hosts.
+	MaxIdleConns int
+	// MaxIdleConnsPerHost is the maximum number of idle connections kept per host.
+	// Almost all requests go to the same Grafana host, so this is the setting
+	// that determines how many connections survive a burst of tool calls.
+	MaxIdleConnsPerHost int
+	// MaxConnsPerHost limits the total number of connections per host.
+	MaxConnsPerHost int
+	// IdleConnTimeout is how long an idle connection is kept in the pool.
+	IdleConnTimeout time.Duration
+}
+
+// defaultHTTPTransportConfig returns the default connection pool settings.
+func defaultHTTPTransportConfig() httpTransportConfig {
+	return httpTransportConfig{
+		MaxIdleConns:        defaultMaxIdleConns,
+		MaxIdleConnsPerHost: defaultMaxIdleConnsPerHost,
+		MaxConnsPerHost:     defaultMaxConnsPerHost,
+		IdleConnTimeout:     defaultIdleConnTimeout,
+	}
+}
+
+// httpTransportConfigFromEnv returns the default connection pool settings,
+// overridden by any of the GRAFANA_MAX_IDLE_CONNS, GRAFANA_MAX_IDLE_CONNS_PER_HOST,
+// GRAFANA_MAX_CONNS_PER_HOST and GRAFANA_IDLE_CONN_TIMEOUT environment variables.
+func httpTransportConfigFromEnv() httpTransportConfig {
+	cfg := defaultHTTPTransportConfig()
+	cfg.MaxIdleConns = intFromEnv(maxIdleConnsEnvVar, cfg.MaxIdleConns)
+	cfg.MaxIdleConnsPerHost = intFromEnv(maxIdleConnsPerHostEnvVar, cfg.MaxIdleConnsPerHost)
+	cfg.MaxConnsPerHost = intFromEnv(maxConnsPerHostEnvVar, cfg.MaxConnsPerHost)
+	cfg.IdleConnTimeout = durationFromEnv(idleConnTimeoutEnvVar, cfg.IdleConnTimeout)
+	return cfg
+}
+
+func intFromEnv(name string, def int) int {
+	v, ok := os.LookupEnv(name)
+	if !ok || v == "" {
+		return def
+	}
+	i, err := strconv.Atoi(v)
+	if err != nil || i < 0 {
+		slog.Warn("Ignoring invalid environment variable", "name", name, "value", v)
+		return def
+	}
+	return i
+}
+
+func durationFromEnv(name string, def time.Duration) time.Duration {
+	v, ok := os.LookupEnv(name)
+	if !ok || v == "" {
+		return def
+	}
+	d, err := time.ParseDuration(v)
+	if err != nil || d < 0 {
+		slog.Warn("Ignoring invalid environment variable", "name", name, "value", v)
+		return def
+	}
+	return d
+}
+
+// newHTTPTransport creates an HTTP transport using the given connection pool settings.
+//
+// The transport is based on http.DefaultTransport, but keeps more idle
+// connections per host (the default is 2, which causes connections to be
+// torn down and re-established during bursts of concurrent tool calls) and
+// always attempts HTTP/2 so concurrent requests can share a connection.
+func newHTTPTransport(cfg httpTransportConfig) *http.Transport {
+	t := http.DefaultTransport.(*http.Transport).Clone()
+	t.MaxIdleConns = cfg.MaxIdleConns
+	t.MaxIdleConnsPerHost = cfg.MaxIdleConnsPerHost
+	t.MaxConnsPerHost = cfg.MaxConnsPerHost
+	t.IdleConnTimeout = cfg.IdleConnTimeout
+	t.ForceAttemptHTTP2 = true
+	return t
+}
+
+var (
+	sharedTransportOnce sync.Once
+	sharedHTTPTransport *http.Transport
+)
+
+// sharedTransport returns the HTTP transport shared by the tools that make
+// their own HTTP requests: the Prometheus and Loki tools, which go through
+// the Grafana datasource proxy, and the OnCall settings lookup. The Grafana
+// OpenAPI and Incident clients use their own transports. It is created on
+// first use, using the settings returned by httpTransportConfigFromEnv.
+func sharedTransport() *http.Transport {
+	sharedTransportOnce.Do(func() {
+		sharedHTTPTransport = newHTTPTransport(httpTransportConfigFromEnv())
+	})
+	return sharedHTTPTransport
+}
+
+// CloseIdleConnections closes any idle connections held by the shared transport.
+// It should be called when the server shuts down.
+func CloseIdleConnections() {
+	sharedTransport().CloseIdleConnections()
+}
+
+var (
+	sharedRoundTripperOnce sync.Once
+	sharedRoundTripper     http.RoundTripper
+)
+
+// SharedRoundTripper returns the round tripper that tools should use for
+// requests to Grafana.
+//
+// It sends requests using sharedTransport and caches responses from read-only
+// metadata endpoints (such as label names and values) for GRAFANA_CACHE_TTL,
+// which defaults to one minute. Setting GRAFANA_CACHE_TTL to 0 disables caching.
+//
+// If GRAFANA_MAX_CONCURRENT_REQUESTS is set to a positive number, at most that
+// many requests made through this round tripper are sent to Grafana at once
+// and the rest wait for a free slot. This covers the datasource proxy requests
+// made by the Prometheus and Loki tools and the OnCall settings lookup, but not
+// the Grafana OpenAPI or Incident clients, which use their own transports.
+// Responses served from the cache don't count against the limit.
+func SharedRoundTripper() http.RoundTripper {
+	sharedRoundTripperOnce.Do(func() {
+		var rt http.RoundTripper = sharedTransport()
+		if limit := intFromEnv(maxConcurrentRequestsEnvVar, 0); limit > 0 {
+			rt = newLimitingRoundTripper(rt, limit)
+		}
+		if ttl := durationFromEnv(cacheTTLEnvVar, defaultCacheTTL); ttl > 0 {
+			rt = newCachingRoundTripper(rt, ttl)
+		}
+		sharedRoundTripper = rt
+	})
+	return sharedRoundTripper
+}
+
+// WarmUpConnections sends a request to the health endpoint of the Grafana
+// instance configured in GRAFANA_URL, so that the DNS lookup, TCP connection
+// and TLS handshake are done before the first tool call rather than during it.
+// The connection is then kept in the shared transport's pool, so only the
+// tools that use sharedTransport (Prometheus, Loki and OnCall) benefit.
+//
+// It does nothing if GRAFANA_URL is not set. Errors are logged and otherwise
+// ignored, since the server works the same way (only more slowly for the first
+// request) without a warm connection.
+func WarmUpConnections(ctx context.Context) {
+	grafanaURL, _ := urlAndAPIKeyFromEnv()
+	grafanaURL = strings.TrimRight(grafanaURL, "/")
+	if grafanaURL == "" {
+		return
+	}
+
+	ctx, cancel := context.WithTimeout(ctx, warmUpTimeout)
+	defer cancel()
+	req, err := http.NewRequestWithContext(ctx, http.MethodGet, grafanaURL+"/api/health", nil)
+	if err != nil {
+		slog.Debug("Not warming up connection to Grafana", "error", err)
+		return
+	}
+	resp, err := sharedTransport().RoundTrip(req)
+	if err != nil {
+		slog.Debug("Failed to warm up connection to Grafana", "error", err)
+		return
+	}
+	// Drain the body so the connection is returned to the pool.
+	_, _ = io.Copy(io.Discard, io.LimitReader(resp.Body, 4096))
+	resp.Body.Close()
+}
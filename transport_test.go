@@ -0,0 +1,73 @@
+//go:build unit
+// +build unit
+
+package mcpgrafana
+
+import (
+	"context"
+	"net/http"
+	"net/http/httptest"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/assert"
+)
+
+func TestHTTPTransportConfigFromEnv(t *testing.T) {
+	t.Run("defaults", func(t *testing.T) {
+		cfg := httpTransportConfigFromEnv()
+		assert.Equal(t, defaultHTTPTransportConfig(), cfg)
+	})
+
+	t.Run("overrides", func(t *testing.T) {
+		t.Setenv(maxIdleConnsEnvVar, "10")
+		t.Setenv(maxIdleConnsPerHostEnvVar, "5")
+		t.Setenv(maxConnsPerHostEnvVar, "50")
+		t.Setenv(idleConnTimeoutEnvVar, "2m")
+		cfg := httpTransportConfigFromEnv()
+		assert.Equal(t, httpTransportConfig{
+			MaxIdleConns:        10,
+			MaxIdleConnsPerHost: 5,
+			MaxConnsPerHost:     50,
+			IdleConnTimeout:     2 * time.Minute,
+		}, cfg)
+	})
+
+	t.Run("invalid values fall back to defaults", func(t *testing.T) {
+		t.Setenv(maxIdleConnsPerHostEnvVar, "lots")
+		t.Setenv(idleConnTimeoutEnvVar, "-1s")
+		cfg := httpTransportConfigFromEnv()
+		assert.Equal(t, defaultHTTPTransportConfig(), cfg)
+	})
+}
+
+func TestNewHTTPTransport(t *testing.T) {
+	cfg := httpTransportConfig{
+		MaxIdleConns:        10,
+		MaxIdleConnsPerHost: 5,
+		MaxConnsPerHost:     50,
+		IdleConnTimeout:     time.Minute,
+	}
+	tr := newHTTPTransport(cfg)
+	assert.Equal(t, 10, tr.MaxIdleConns)
+	assert.Equal(t, 5, tr.MaxIdleConnsPerHost)
+	assert.Equal(t, 50, tr.MaxConnsPerHost)
+	assert.Equal(t, time.Minute, tr.IdleConnTimeout)
+	assert.True(t, tr.ForceAttemptHTTP2)
+	assert.NotNil(t, tr.Proxy, "settings from http.DefaultTransport should be kept")
+}
+
+func TestWarmUpConnections(t *testing.T) {
+	var path string
+	ts := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		path = r.URL.Path
+	}))
+	defer ts.Close()
+
+	for _, u := range []string{ts.URL, ts.URL + "/"} {
+		path = ""
+		t.Setenv(grafanaURLEnvVar, u)
+		WarmUpConnections(context.Background())
+		assert.Equal(t, "/api/health", path, u)
+	}
+}